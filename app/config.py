@@ -1,10 +1,20 @@
 """Application configuration using Pydantic settings."""
 import os
 import re
+from datetime import timedelta
 from typing import Union
 from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Precompiled size parser shared by every Settings() validation
+_SIZE_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(B|KB|MB|GB)?')
+_SIZE_UNITS = {
+    'B': 1,
+    'KB': 1 << 10,
+    'MB': 1 << 20,
+    'GB': 1 << 30
+}
+
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
@@ -23,6 +33,10 @@ class Settings(BaseSettings):
     max_file_size: Union[str, int] = "100MB"  # Support units: 100MB, 1GB, etc.
     enable_docs: bool = False
     debug: bool = False  # Enable detailed debug logging
+
+    # Allowed CORS origins; deployments behind a fixed frontend should
+    # narrow this from the permissive default
+    cors_origins: list[str] = ["*"]
     
     # Server settings
     host: str = "0.0.0.0"
@@ -44,23 +58,21 @@ class Settings(BaseSettings):
         
         # Convert to string and parse
         v_str = str(v).strip().upper()
-        
+
         # Match number and optional unit
-        match = re.match(r'^(\d+(?:\.\d+)?)\s*(B|KB|MB|GB)?$', v_str)
+        match = _SIZE_RE.fullmatch(v_str)
         if not match:
             raise ValueError(f"Invalid file size format: {v}. Use formats like: 100MB, 1GB, 500MB")
-        
+
         size = float(match.group(1))
         unit = match.group(2) or 'B'
-        
-        units = {
-            'B': 1,
-            'KB': 1024,
-            'MB': 1024 ** 2,
-            'GB': 1024 ** 3
-        }
-        
-        return int(size * units[unit])
+
+        return int(size * _SIZE_UNITS[unit])
 
 
 settings = Settings()
+
+# Derived values precomputed once at import so hot paths don't re-derive them
+MAX_FILE_SIZE: int = int(settings.max_file_size)
+MAX_FILE_SIZE_MB: float = MAX_FILE_SIZE / 1_048_576
+EXPIRY_DELTA: timedelta = timedelta(days=settings.file_expiry_days)
@@ -1,4 +1,5 @@
 """Database configuration and session management."""
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
@@ -17,6 +18,25 @@ engine = create_async_engine(
     future=True
 )
 
+
+@event.listens_for(engine.sync_engine, "connect")
+def _set_sqlite_pragmas(dbapi_conn, _connection_record):
+    """Tune SQLite per-connection: WAL so writers don't block readers,
+    relaxed fsync, in-memory temp store and a larger page cache."""
+    # One execute() per pragma: the aiosqlite cursor adapter SQLAlchemy
+    # hands this hook does not implement executescript
+    cursor = dbapi_conn.cursor()
+    for pragma in (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA mmap_size=268435456",
+        "PRAGMA cache_size=-65536",
+        "PRAGMA busy_timeout=5000",
+    ):
+        cursor.execute(pragma)
+    cursor.close()
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
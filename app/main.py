@@ -1,14 +1,16 @@
 """FilePulse - Secure file sharing with automatic expiry."""
 import logging
+from functools import lru_cache
 from pathlib import Path
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.responses import Response
+from starlette.routing import Route
 
-from app.config import settings
+from app.config import settings, MAX_FILE_SIZE_MB
 from app.database import init_db
 from app.routers import upload, download
 from app.utils.scheduler import FileCleanupScheduler
@@ -33,7 +35,7 @@ async def lifespan(app: FastAPI):
     # Log configuration
     logger.info(f"Configuration loaded:")
     logger.info(f"  - Upload directory: {settings.upload_dir}")
-    logger.info(f"  - Max file size: {settings.max_file_size:,} bytes ({settings.max_file_size / 1024 / 1024:.1f} MB)")
+    logger.info(f"  - Max file size: {settings.max_file_size:,} bytes ({MAX_FILE_SIZE_MB:.1f} MB)")
     logger.info(f"  - File expiry: {settings.file_expiry_days} days")
     logger.info(f"  - Debug mode: {settings.debug}")
     logger.info(f"  - Docs enabled: {settings.enable_docs}")
@@ -46,6 +48,11 @@ async def lifespan(app: FastAPI):
     # Initialize database
     await init_db()
     logger.info("Database initialized")
+
+    # Warm the template cache so the first page hit doesn't pay parse cost
+    templates = get_templates()
+    for name in ("index.html", "download.html"):
+        templates.env.get_template(name)
     
     # Start cleanup scheduler
     scheduler.start()
@@ -67,19 +74,30 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# Setup templates
-templates = Jinja2Templates(directory="app/templates")
-
-# Setup templates - pointing to static directory
-templates = Jinja2Templates(directory="app/static")
+@lru_cache(maxsize=1)
+def get_templates():
+    """Lazily build the Jinja2 template environment (HTML lives in app/static)."""
+    import tempfile
+    import jinja2
+    from fastapi.templating import Jinja2Templates
+
+    env = jinja2.Environment(
+        loader=jinja2.FileSystemLoader("app/static"),
+        autoescape=jinja2.select_autoescape(),
+        auto_reload=False,
+        bytecode_cache=jinja2.FileSystemBytecodeCache(tempfile.gettempdir())
+    )
+    return Jinja2Templates(env=env)
 
-# Add CORS middleware
+# Add CORS middleware with explicit origins/methods so the wildcard
+# branch is skipped per request; max_age keeps preflights cached for a day
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=settings.cors_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type", "Content-Disposition"],
+    max_age=86400,
 )
 
 # Mount static files (CSS, JS only - no HTML)
@@ -94,7 +112,7 @@ app.include_router(download.router)
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     """Render homepage with server config injected."""
-    return templates.TemplateResponse(
+    return get_templates().TemplateResponse(
         request=request,
         name="index.html",
         context={
@@ -107,7 +125,7 @@ async def home(request: Request):
 @app.get("/download.html", response_class=HTMLResponse)
 async def download_page(request: Request):
     """Render download page."""
-    return templates.TemplateResponse(
+    return get_templates().TemplateResponse(
         request=request,
         name="download.html",
         context={}
@@ -118,25 +136,23 @@ async def download_page(request: Request):
 @app.get("/index.html", response_class=HTMLResponse)
 async def index_redirect(request: Request):
     """Redirect to homepage."""
-    return templates.TemplateResponse(
-        request=request,
-        name="index.html",
-        context={
-            "max_file_size": settings.max_file_size,
-            "file_expiry_days": settings.file_expiry_days
-        }
-    )
-
-# Mount static files
-static_dir = Path(__file__).parent / "static"
-if static_dir.exists():
-    app.mount("/", StaticFiles(directory=str(static_dir), html=True), name="static")
+    return await home(request)
+
+# Health probe: a prebuilt response on a bare Starlette route, matched
+# first so probes skip FastAPI's dependency/serialization pipeline and
+# the static catch-all mount
+_HEALTH_RESPONSE = Response(
+    content=b'{"status": "healthy", "service": "FilePulse"}',
+    media_type="application/json"
+)
 
 
-@app.get("/health")
-async def health_check():
+async def health_check(request: Request) -> Response:
     """Health check endpoint."""
-    return {"status": "healthy", "service": "FilePulse"}
+    return _HEALTH_RESPONSE
+
+
+app.router.routes.insert(0, Route("/health", health_check))
 
 
 if __name__ == "__main__":
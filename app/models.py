@@ -1,10 +1,21 @@
 """Database models for file records."""
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from sqlalchemy import String, Integer, DateTime, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database import Base
-from app.config import settings
+from app.config import EXPIRY_DELTA
+
+
+def ensure_utc(dt: datetime) -> datetime:
+    """Interpret naive datetimes from the database as UTC.
+
+    Columns are declared timezone-aware and written with UTC values,
+    but SQLite drops the offset on storage, so reads come back naive.
+    """
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt
 
 
 class FileRecord(Base):
@@ -21,20 +32,24 @@ class FileRecord(Base):
     expiry_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     file_path: Mapped[str] = mapped_column(String(512), nullable=False)
     file_size: Mapped[int] = mapped_column(Integer, nullable=False)
-    file_md5: Mapped[str] = mapped_column(String(32), nullable=False, index=True)  # MD5 hash
+    file_md5: Mapped[str] = mapped_column(String(64), nullable=False, index=True)  # Content hash (hex)
     
-    # Index on MD5 for duplicate detection and expiry_time for cleanup
+    # Index on MD5 for duplicate detection; the (expiry_time, file_md5)
+    # composite makes the cleanup scans index-only and subsumes a plain
+    # expiry_time index
     __table_args__ = (
-        Index('idx_expiry_time', 'expiry_time'),
+        Index('idx_expiry_md5', 'expiry_time', 'file_md5'),
         Index('idx_file_md5', 'file_md5'),
+        Index('idx_share_expiry', 'share_code', 'expiry_time'),
+        Index('idx_size_md5', 'file_size', 'file_md5'),
     )
     
     def __init__(self, **kwargs):
         """Initialize file record with auto-calculated expiry time."""
         if 'expiry_time' not in kwargs and 'upload_time' in kwargs:
-            kwargs['expiry_time'] = kwargs['upload_time'] + timedelta(days=settings.file_expiry_days)
+            kwargs['expiry_time'] = kwargs['upload_time'] + EXPIRY_DELTA
         elif 'expiry_time' not in kwargs:
             upload_time = datetime.now(timezone.utc)
             kwargs['upload_time'] = upload_time
-            kwargs['expiry_time'] = upload_time + timedelta(days=settings.file_expiry_days)
+            kwargs['expiry_time'] = upload_time + EXPIRY_DELTA
         super().__init__(**kwargs)
@@ -1,64 +1,137 @@
 """Download router with progress tracking."""
-import asyncio
+import os
+import re
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import StreamingResponse, FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, bindparam
 
 from app.database import get_db
-from app.models import FileRecord
+from app.models import FileRecord, ensure_utc
+from app.schemas import FileInfoResponse
+from app.utils.progress import ProgressBroker
 
 router = APIRouter(prefix="/api", tags=["download"])
 
-# Store download progress in memory
-download_progress: Dict[str, dict] = {}
+# Per-process download progress broker (in production, use Redis pub/sub)
+download_progress = ProgressBroker()
 
+# Share codes are 6 alphanumeric chars; anything else can 404 without
+# a DB roundtrip (keeps garbage-code floods off the database)
+_SHARE_CODE_RE = re.compile(r'\A[A-Za-z0-9]{6}\Z')
 
-@router.get("/file/{share_code}")
+# Statement built once at import; executed with a bound share code so
+# every request hits SQLAlchemy's compiled cache instead of rebuilding
+# the statement AST
+_STMT_FILE_BY_CODE = select(
+    FileRecord.original_filename,
+    FileRecord.file_size,
+    FileRecord.file_path,
+    FileRecord.upload_time,
+    FileRecord.expiry_time
+).where(FileRecord.share_code == bindparam("code"))
+
+# Short-TTL LRU over share-code rows: hot downloads (curl loops, CDN
+# revalidation) skip the DB entirely. Rows are immutable apart from
+# expiry bumps on duplicate uploads, and the expiry check below always
+# runs, so staleness is bounded by the TTL and can only misreport
+# within that window.
+_SHARE_CACHE_MAX = 10_000
+_SHARE_CACHE_TTL = 60.0
+_share_cache: "OrderedDict[str, tuple[float, object]]" = OrderedDict()
+
+
+def _share_cache_get(share_code: str):
+    """Return a cached row for the code, or None if absent/stale."""
+    entry = _share_cache.get(share_code)
+    if entry is None:
+        return None
+    deadline, row = entry
+    if deadline < time.monotonic():
+        _share_cache.pop(share_code, None)
+        return None
+    _share_cache.move_to_end(share_code)
+    return row
+
+
+def _share_cache_put(share_code: str, row) -> None:
+    """Cache a row for the code, evicting the oldest entry when full."""
+    _share_cache[share_code] = (time.monotonic() + _SHARE_CACHE_TTL, row)
+    _share_cache.move_to_end(share_code)
+    while len(_share_cache) > _SHARE_CACHE_MAX:
+        _share_cache.popitem(last=False)
+
+
+async def _fetch_active_file(share_code: str, db: AsyncSession):
+    """
+    Fetch the columns needed to serve a share code.
+
+    Selects plain columns instead of hydrating a full ORM instance;
+    both endpoints only read a handful of fields.
+
+    Args:
+        share_code: The share code for the file
+        db: Database session
+
+    Returns:
+        Row with filename, size, path and time columns
+
+    Raises:
+        HTTPException: 404 if malformed or unknown, 410 if expired
+    """
+    if not _SHARE_CODE_RE.match(share_code):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    row = _share_cache_get(share_code)
+    if row is None:
+        result = await db.execute(_STMT_FILE_BY_CODE, {"code": share_code})
+        row = result.one_or_none()
+
+        if row is None:
+            raise HTTPException(status_code=404, detail="File not found")
+
+        _share_cache_put(share_code, row)
+
+    # Check if file is expired (kept in Python so expired files get a
+    # distinct 410 instead of folding into the 404 case)
+    if ensure_utc(row.expiry_time) < datetime.now(timezone.utc):
+        raise HTTPException(status_code=410, detail="File has expired")
+
+    return row
+
+
+@router.get("/file/{share_code}", response_model=FileInfoResponse)
 async def get_file_info(
     share_code: str,
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get file information by share code.
-    
+
     Args:
         share_code: The share code for the file
         db: Database session
-        
+
     Returns:
         File metadata
     """
-    # Query file record
-    stmt = select(FileRecord).where(FileRecord.share_code == share_code)
-    result = await db.execute(stmt)
-    file_record = result.scalar_one_or_none()
-    
-    if not file_record:
-        raise HTTPException(status_code=404, detail="File not found")
-    
-    # Check if file is expired
-    # Check if file is expired
-    expiry_check = file_record.expiry_time
-    if expiry_check.tzinfo is None:
-        expiry_check = expiry_check.replace(tzinfo=timezone.utc)
-        
-    if expiry_check < datetime.now(timezone.utc):
-        raise HTTPException(status_code=410, detail="File has expired")
-    
-    # Check if file exists on disk
-    file_path = Path(file_record.file_path)
-    if not file_path.exists():
+    row = await _fetch_active_file(share_code, db)
+
+    # Check if file exists on disk (single stat, no separate exists())
+    try:
+        stat_result = os.stat(row.file_path)
+    except OSError:
         raise HTTPException(status_code=404, detail="File not found on server")
-    
+
     return {
-        "filename": file_record.original_filename,
-        "file_size": file_record.file_size,
-        "upload_time": file_record.upload_time.isoformat(),
-        "expiry_time": file_record.expiry_time.isoformat(),
+        "filename": row.original_filename,
+        "file_size": stat_result.st_size,
+        "upload_time": row.upload_time,
+        "expiry_time": row.expiry_time,
         "share_code": share_code
     }
 
@@ -78,43 +151,31 @@ async def download_file(
     Returns:
         File download stream
     """
-    # Query file record
-    stmt = select(FileRecord).where(FileRecord.share_code == share_code)
-    result = await db.execute(stmt)
-    file_record = result.scalar_one_or_none()
-    
-    if not file_record:
-        raise HTTPException(status_code=404, detail="File not found")
-    
-    # Check if file is expired
-    expiry_check = file_record.expiry_time
-    if expiry_check.tzinfo is None:
-        expiry_check = expiry_check.replace(tzinfo=timezone.utc)
-        
-    if expiry_check < datetime.now(timezone.utc):
-        raise HTTPException(status_code=410, detail="File has expired")
-    
+    row = await _fetch_active_file(share_code, db)
+
     # Check if file exists on disk
-    file_path = Path(file_record.file_path)
-    if not file_path.exists():
+    file_path = Path(row.file_path)
+    try:
+        stat_result = file_path.stat()
+    except OSError:
         raise HTTPException(status_code=404, detail="File not found on server")
-    
-    # Stream file with progress tracking
-    def iterfile():
-        """Iterator to stream file in chunks."""
-        chunk_size = 64 * 1024  # 64KB chunks
-        with open(file_path, "rb") as f:
-            while chunk := f.read(chunk_size):
-                yield chunk
-    
-    # Return file as streaming response
-    return StreamingResponse(
-        iterfile(),
+
+    if hasattr(os, "posix_fadvise"):
+        # Kick off readahead so the first chunks are already cached
+        # by the time the response starts streaming
+        fd = os.open(row.file_path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+
+    # Serve via FileResponse so the server can use sendfile/zero-copy
+    # instead of pushing every chunk through a Python generator
+    return FileResponse(
+        path=file_path,
+        filename=row.original_filename,
         media_type="application/octet-stream",
-        headers={
-            "Content-Disposition": f'attachment; filename="{file_record.original_filename}"',
-            "Content-Length": str(file_record.file_size)
-        }
+        stat_result=stat_result
     )
 
 
@@ -129,22 +190,7 @@ async def get_download_progress(download_id: str):
     Returns:
         Server-sent events with progress updates
     """
-    async def event_generator():
-        """Generate SSE events for download progress."""
-        while True:
-            if download_id in download_progress:
-                progress = download_progress[download_id]
-                yield f"data: {progress}\n\n"
-                
-                if progress.get("completed", False):
-                    del download_progress[download_id]
-                    break
-            else:
-                yield f"data: {{'progress': 0, 'status': 'waiting'}}\n\n"
-            
-            await asyncio.sleep(0.5)
-    
     return StreamingResponse(
-        event_generator(),
+        download_progress.event_stream(download_id),
         media_type="text/event-stream"
     )
@@ -1,31 +1,69 @@
 """Upload router with progress tracking and MD5 deduplication."""
 import os
-import asyncio
 import time
 import logging
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict
 from fastapi import APIRouter, UploadFile, File, Depends, Request, HTTPException
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import select, update, bindparam
+from sqlalchemy.exc import IntegrityError
 
 from app.database import get_db
-from app.models import FileRecord
+from app.models import FileRecord, ensure_utc
+from app.schemas import UploadResponse
 from app.utils.security import sanitize_filename, generate_share_code, get_client_ip
-from app.utils.file_utils import calculate_md5_from_bytes
-from app.config import settings
+from app.utils.file_utils import new_file_hasher
+from app.utils.progress import ProgressBroker
+from app.config import settings, EXPIRY_DELTA, MAX_FILE_SIZE, MAX_FILE_SIZE_MB
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api", tags=["upload"])
 
-# Store upload progress in memory (in production, use Redis)
-upload_progress: Dict[str, dict] = {}
+# Chunk size for streaming uploads to disk (1MB)
+UPLOAD_CHUNK_SIZE = 1 << 20
 
+# Collisions on a 6-char alphanumeric code are astronomically rare;
+# a handful of insert retries is more than enough
+SHARE_CODE_MAX_ATTEMPTS = 3
 
-@router.post("/upload")
+# Files smaller than this skip the dedup lookup entirely: the DB
+# roundtrip costs more than storing a fresh tiny copy
+DEDUP_MIN_BYTES = 64 * 1024
+
+# Per-process upload progress broker (in production, use Redis pub/sub)
+upload_progress = ProgressBroker()
+
+# Dedup lookup built once at import and reused with bound values. The
+# size equality lets the planner reject non-matching rows before the
+# hash compare and guards against hash-only false positives.
+_STMT_FILE_BY_MD5 = (
+    select(FileRecord)
+    .where(
+        FileRecord.file_size == bindparam("size"),
+        FileRecord.file_md5 == bindparam("md5")
+    )
+    .order_by(FileRecord.expiry_time.desc())
+    .limit(1)
+)
+
+
+@lru_cache(maxsize=8)
+def _date_dir(base_dir: str, year: int, month: int, day: int) -> Path:
+    """Resolve (and create once per day) the date-partitioned upload dir.
+
+    Keyed on base_dir as well so runtime changes to settings.upload_dir
+    don't serve stale paths.
+    """
+    path = Path(base_dir) / f"{year:04d}/{month:02d}/{day:02d}"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+@router.post("/upload", response_model=UploadResponse)
 async def upload_file(
     file: UploadFile = File(...),
     request: Request = None,
@@ -42,82 +80,107 @@ async def upload_file(
     Returns:
         Share code and expiry information
     """
-    # Validate file size
-    file_content = await file.read()
-    file_size = len(file_content)
-    
     # Debug logging
     if settings.debug:
         logger.info(f"[DEBUG] Upload attempt - Filename: {file.filename}")
+        logger.info(f"[DEBUG] Max allowed: {MAX_FILE_SIZE:,} bytes ({MAX_FILE_SIZE_MB:.2f} MB)")
+
+    # Stream file to a temp location, hashing and counting size in one pass.
+    # This keeps peak memory at O(chunk_size) instead of O(file_size).
+    tmp_dir = Path(settings.upload_dir) / "tmp"
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = tmp_dir / f"upload_{int(time.time() * 1000)}_{os.getpid()}_{id(file)}"
+
+    file_hasher = new_file_hasher()
+    file_size = 0
+
+    try:
+        with open(tmp_path, "wb") as tmp_file:
+            if hasattr(os, "posix_fadvise"):
+                # Hint the kernel this is a one-shot sequential write
+                os.posix_fadvise(
+                    tmp_file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL
+                )
+
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+
+                if file_size > MAX_FILE_SIZE:
+                    error_msg = f"File size exceeds maximum allowed size of {MAX_FILE_SIZE_MB:.0f}MB ({MAX_FILE_SIZE} bytes)"
+
+                    if settings.debug:
+                        logger.warning(f"[DEBUG] Upload rejected: {error_msg}")
+                        logger.warning(f"[DEBUG] File: {file.filename}, Size so far: {file_size:,} bytes")
+
+                    raise HTTPException(
+                        status_code=413,
+                        detail=error_msg
+                    )
+
+                file_hasher.update(chunk)
+                tmp_file.write(chunk)
+
+            if hasattr(os, "posix_fadvise"):
+                # Freshly uploaded bytes are rarely read back right away;
+                # ask the kernel to drop the (flushed) pages so hot
+                # download files stay in the page cache
+                tmp_file.flush()
+                os.posix_fadvise(
+                    tmp_file.fileno(), 0, 0, os.POSIX_FADV_DONTNEED
+                )
+    except BaseException:
+        # Don't leave partial temp files behind on abort
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    file_md5 = file_hasher.hexdigest()
+
+    if settings.debug:
         logger.info(f"[DEBUG] File size: {file_size:,} bytes ({file_size / 1024 / 1024:.2f} MB)")
-        logger.info(f"[DEBUG] Max allowed: {settings.max_file_size:,} bytes ({settings.max_file_size / 1024 / 1024:.2f} MB)")
-        logger.info(f"[DEBUG] Size check: {file_size} {'<=' if file_size <= settings.max_file_size else '>'} {settings.max_file_size}")
-    
-    if file_size > settings.max_file_size:
-        # Format the limit in a human-readable way
-        limit_mb = settings.max_file_size / (1024 * 1024)
-        error_msg = f"File size exceeds maximum allowed size of {limit_mb:.0f}MB ({settings.max_file_size} bytes)"
-        
-        if settings.debug:
-            logger.warning(f"[DEBUG] Upload rejected: {error_msg}")
-            logger.warning(f"[DEBUG] File: {file.filename}, Size: {file_size:,} bytes")
-        
-        raise HTTPException(
-            status_code=413,
-            detail=error_msg
+
+    # Check if file with same MD5 already exists (skipped for tiny files)
+    existing_record = None
+    if file_size >= DEDUP_MIN_BYTES:
+        result = await db.execute(
+            _STMT_FILE_BY_MD5, {"size": file_size, "md5": file_md5}
         )
-    
-    # Calculate MD5 hash
-    file_md5 = calculate_md5_from_bytes(file_content)
-    
-    # Check if file with same MD5 already exists
-    stmt = select(FileRecord).where(FileRecord.file_md5 == file_md5).order_by(FileRecord.expiry_time.desc())
-    result = await db.execute(stmt)
-    existing_record = result.scalars().first()
+        existing_record = result.scalars().first()
     
     # Sanitize filename
     original_filename = file.filename or "unnamed"
     safe_filename = sanitize_filename(original_filename)
     
-    # Generate unique share code
-    while True:
-        share_code = generate_share_code()
-        stmt = select(FileRecord).where(FileRecord.share_code == share_code)
-        result = await db.execute(stmt)
-        if not result.scalar_one_or_none():
-            break
-    
+    # Generate share code; uniqueness is enforced by the DB constraint
+    # on insert rather than a pre-check query (see commit loop below)
+    share_code = generate_share_code()
+
     upload_time = datetime.now(timezone.utc)
-    expiry_time = upload_time + timedelta(days=settings.file_expiry_days)
+    expiry_time = upload_time + EXPIRY_DELTA
     
     # If duplicate exists, reuse the file path
+    bump_existing_expiry = False
     if existing_record:
         file_path = existing_record.file_path
         stored_filename = existing_record.filename
-        
+
+        # Physical file already on disk - discard the temp copy
+        tmp_path.unlink(missing_ok=True)
+
         # Update expiry_time of existing file to the latest
         # This keeps the physical file until ALL shares expire
-        existing_expiry = existing_record.expiry_time
-        if existing_expiry.tzinfo is None:
-            existing_expiry = existing_expiry.replace(tzinfo=timezone.utc)
-            
-        if expiry_time > existing_expiry:
-            stmt = update(FileRecord).where(
-                FileRecord.file_md5 == file_md5
-            ).values(expiry_time=expiry_time)
-            await db.execute(stmt)
+        bump_existing_expiry = expiry_time > ensure_utc(existing_record.expiry_time)
     else:
-        # New file - save it
-        date_path = upload_time.strftime("%Y/%m/%d")
-        upload_dir = Path(settings.upload_dir) / date_path
-        upload_dir.mkdir(parents=True, exist_ok=True)
-        
+        # New file - move the fully-streamed temp file into place
+        upload_dir = _date_dir(
+            settings.upload_dir,
+            upload_time.year, upload_time.month, upload_time.day
+        )
+
         timestamp = int(upload_time.timestamp() * 1000)
         stored_filename = f"{timestamp}_{share_code}_{safe_filename}"
         file_path = upload_dir / stored_filename
-        
-        with open(file_path, "wb") as f:
-            f.write(file_content)
+
+        os.replace(tmp_path, file_path)
     
     # Get client IP
     client_ip = get_client_ip(request)
@@ -135,8 +198,29 @@ async def upload_file(
         file_md5=file_md5
     )
     
-    db.add(file_record)
-    await db.commit()
+    # Insert optimistically, relying on the unique constraint on
+    # share_code; regenerate and retry only on the rare collision
+    for attempt in range(SHARE_CODE_MAX_ATTEMPTS):
+        if bump_existing_expiry:
+            stmt = update(FileRecord).where(
+                FileRecord.file_md5 == file_md5
+            ).values(expiry_time=expiry_time)
+            await db.execute(stmt)
+
+        db.add(file_record)
+        try:
+            await db.commit()
+            break
+        except IntegrityError:
+            await db.rollback()
+            if attempt == SHARE_CODE_MAX_ATTEMPTS - 1:
+                raise HTTPException(
+                    status_code=500,
+                    detail="Could not allocate a unique share code"
+                )
+            share_code = generate_share_code()
+            file_record.share_code = share_code
+
     await db.refresh(file_record)
     
     # Debug logging
@@ -153,8 +237,8 @@ async def upload_file(
         "share_code": share_code,
         "filename": safe_filename,
         "file_size": file_size,
-        "upload_time": upload_time.isoformat(),
-        "expiry_time": file_record.expiry_time.isoformat(),
+        "upload_time": upload_time,
+        "expiry_time": file_record.expiry_time,
         "message": f"File uploaded successfully. Share code: {share_code}"
     }
 
@@ -170,22 +254,7 @@ async def get_upload_progress(upload_id: str):
     Returns:
         Server-sent events with progress updates
     """
-    async def event_generator():
-        """Generate SSE events for upload progress."""
-        while True:
-            if upload_id in upload_progress:
-                progress = upload_progress[upload_id]
-                yield f"data: {progress}\n\n"
-                
-                if progress.get("completed", False):
-                    del upload_progress[upload_id]
-                    break
-            else:
-                yield f"data: {{'progress': 0, 'status': 'waiting'}}\n\n"
-            
-            await asyncio.sleep(0.5)
-    
     return StreamingResponse(
-        event_generator(),
+        upload_progress.event_stream(upload_id),
         media_type="text/event-stream"
     )
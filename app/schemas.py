@@ -0,0 +1,30 @@
+"""Pydantic response schemas.
+
+With a response model set, FastAPI serializes handler output directly
+to JSON bytes in pydantic-core (Rust) instead of running the Python
+jsonable_encoder, which is the fast path on current FastAPI.
+"""
+from datetime import datetime
+from pydantic import BaseModel
+
+
+class UploadResponse(BaseModel):
+    """Response for a successful file upload."""
+
+    success: bool
+    share_code: str
+    filename: str
+    file_size: int
+    upload_time: datetime
+    expiry_time: datetime
+    message: str
+
+
+class FileInfoResponse(BaseModel):
+    """File metadata returned for a share code."""
+
+    filename: str
+    file_size: int
+    upload_time: datetime
+    expiry_time: datetime
+    share_code: str
@@ -0,0 +1,64 @@
+"""Push-based progress tracking for SSE endpoints."""
+import asyncio
+import json
+from collections import OrderedDict
+
+# Bound the number of tracked transfers so abandoned IDs can't grow
+# the map without limit
+MAX_TRACKED_TRANSFERS = 1024
+
+# Give up on a stream after this long without a progress update
+SSE_TIMEOUT_SECONDS = 15.0
+
+
+class ProgressBroker:
+    """Per-process broker mapping transfer IDs to progress queues.
+
+    Producers push updates with publish(); SSE endpoints consume them
+    via event_stream(), which waits on a queue instead of polling on a
+    timer. State is per-process: with multiple workers, back this with
+    Redis pub/sub instead.
+    """
+
+    def __init__(self, max_tracked: int = MAX_TRACKED_TRANSFERS):
+        """Initialize the broker with an LRU-bounded queue map."""
+        self._queues: "OrderedDict[str, asyncio.Queue]" = OrderedDict()
+        self._max_tracked = max_tracked
+
+    def queue_for(self, transfer_id: str) -> asyncio.Queue:
+        """Get or create the queue for a transfer, evicting the oldest entries."""
+        queue = self._queues.get(transfer_id)
+        if queue is None:
+            while len(self._queues) >= self._max_tracked:
+                self._queues.popitem(last=False)
+            queue = self._queues[transfer_id] = asyncio.Queue()
+        else:
+            self._queues.move_to_end(transfer_id)
+        return queue
+
+    def publish(self, transfer_id: str, progress: dict) -> None:
+        """Push a progress update to any listening SSE stream."""
+        self.queue_for(transfer_id).put_nowait(progress)
+
+    def discard(self, transfer_id: str) -> None:
+        """Drop tracking state for a finished or abandoned transfer."""
+        self._queues.pop(transfer_id, None)
+
+    async def event_stream(self, transfer_id: str):
+        """Yield SSE-formatted progress events until completion or timeout."""
+        queue = self.queue_for(transfer_id)
+        try:
+            while True:
+                try:
+                    progress = await asyncio.wait_for(
+                        queue.get(), timeout=SSE_TIMEOUT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    break
+
+                yield f"data: {json.dumps(progress)}\n\n"
+
+                if progress.get("completed", False):
+                    break
+        finally:
+            self.discard(transfer_id)
@@ -1,18 +1,97 @@
 """Background scheduler for cleaning up expired files."""
 import os
+import shutil
+import asyncio
 import logging
+import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from sqlalchemy import select
+from sqlalchemy import select, delete, bindparam
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.database import AsyncSessionLocal
 from app.models import FileRecord
 
 logger = logging.getLogger(__name__)
 
 
+# Cleanup statements built once at import; each run only binds :now, so
+# the compiled SQL is reused across scheduler ticks
+_STMT_EXPIRED_PROBE = select(FileRecord.id).where(
+    FileRecord.expiry_time < bindparam("now")
+).limit(1)
+
+_STMT_ACTIVE_HASHES = select(FileRecord.file_md5).where(
+    FileRecord.expiry_time >= bindparam("now")
+).distinct()
+
+_STMT_DELETE_EXPIRED = delete(FileRecord).where(
+    FileRecord.expiry_time < bindparam("now")
+).returning(
+    FileRecord.file_path,
+    FileRecord.file_md5
+).execution_options(synchronize_session=False)
+
+
+def _safe_unlink(file_path):
+    """Unlink one physical file, logging but tolerating failures.
+
+    Args:
+        file_path: Path string to remove
+    """
+    try:
+        file_path_obj = Path(file_path)
+        if file_path_obj.exists():
+            file_path_obj.unlink()
+            logger.info(f"Deleted physical file: {file_path}")
+    except Exception as e:
+        logger.error(f"Error deleting physical file {file_path}: {e}")
+
+
+def _discard_files(file_paths):
+    """Move expired files into a per-run scratch dir and rmtree it.
+
+    Renaming is a pure metadata operation, so the source date directories
+    see one batch of entry removals instead of interleaved unlinks, and
+    the final rmtree lets the filesystem coalesce the actual frees. Files
+    that cannot be renamed (already gone, cross-device) fall back to a
+    direct unlink.
+
+    Args:
+        file_paths: Iterable of path strings to remove
+    """
+    trash_dir = Path(settings.upload_dir) / f".trash-{uuid.uuid4().hex}"
+    trash_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        for index, file_path in enumerate(file_paths):
+            try:
+                os.rename(file_path, trash_dir / f"{index}")
+                logger.info(f"Deleted physical file: {file_path}")
+            except FileNotFoundError:
+                pass
+            except OSError:
+                _safe_unlink(file_path)
+    finally:
+        shutil.rmtree(trash_dir, ignore_errors=True)
+
+
+async def _unlink_files(file_paths):
+    """Remove a batch of physical files in a worker thread.
+
+    The renames and rmtree are blocking syscalls; running them on the
+    event loop would stall HTTP handlers for the duration of the nightly
+    cleanup.
+
+    Args:
+        file_paths: Iterable of path strings to remove
+    """
+    if not file_paths:
+        return
+    await asyncio.to_thread(_discard_files, file_paths)
+
+
 class FileCleanupScheduler:
     """Scheduler for automatic file cleanup."""
     
@@ -41,49 +120,40 @@ class FileCleanupScheduler:
     async def _cleanup_with_session(self, session: AsyncSession):
         """Perform cleanup with the provided session."""
         try:
-            # Query for expired files
             now = datetime.now(timezone.utc)
-            stmt = select(FileRecord).where(FileRecord.expiry_time < now)
-            result = await session.execute(stmt)
-            expired_files = result.scalars().all()
-            
+
+            # Cheap indexed probe first: most daily runs have nothing to
+            # do, so bail before the active-hash query and the delete
+            probe_result = await session.execute(_STMT_EXPIRED_PROBE, {"now": now})
+            if probe_result.first() is None:
+                logger.info("Cleanup completed. No expired records found")
+                return
+
+            # Hashes still referenced by non-expired shares, fetched
+            # once up front instead of one existence query per record
+            active_result = await session.execute(_STMT_ACTIVE_HASHES, {"now": now})
+            active_md5s = set(active_result.scalars())
+
             deleted_count = 0
             files_to_delete = set()  # Track unique file paths to delete
+
+            # One DELETE ... RETURNING both removes the rows and hands
+            # back the columns needed for physical deletion - the scan
+            # and the delete collapse into a single round-trip
+            delete_result = await session.execute(_STMT_DELETE_EXPIRED, {"now": now})
+
+            for file_path, file_md5 in delete_result:
+                deleted_count += 1
+                # Only mark for physical deletion if no other shares exist
+                if file_md5 not in active_md5s:
+                    files_to_delete.add(file_path)
             
-            for file_record in expired_files:
-                try:
-                    # Check if other non-expired records share the same file
-                    stmt_check = select(FileRecord).where(
-                        FileRecord.file_md5 == file_record.file_md5,
-                        FileRecord.expiry_time >= now,
-                        FileRecord.id != file_record.id
-                    )
-                    check_result = await session.execute(stmt_check)
-                    other_shares = check_result.scalars().first()
-                    
-                    # Only mark for physical deletion if no other shares exist
-                    if not other_shares:
-                        files_to_delete.add(file_record.file_path)
-                    
-                    # Always delete the database record
-                    await session.delete(file_record)
-                    deleted_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error processing file {file_record.filename}: {e}")
-                    continue
-            
-            # Delete physical files
-            for file_path in files_to_delete:
-                try:
-                    file_path_obj = Path(file_path)
-                    if file_path_obj.exists():
-                        file_path_obj.unlink()
-                        logger.info(f"Deleted physical file: {file_path}")
-                except Exception as e:
-                    logger.error(f"Error deleting physical file {file_path}: {e}")
-            
+            # Commit before touching disk: if the commit fails and the
+            # rows come back, their files must still exist
             await session.commit()
+
+            # Delete physical files as one batch, off the event loop
+            await _unlink_files(files_to_delete)
             logger.info(f"Cleanup completed. Deleted {deleted_count} expired records, {len(files_to_delete)} physical files")
             
         except Exception as e:
@@ -92,24 +162,22 @@ class FileCleanupScheduler:
     
     def start(self):
         """Start the scheduler with daily cleanup job."""
-        # Run cleanup every day at 2 AM
+        # Run cleanup every day at 2 AM; next_run_time=now also fires it
+        # once at startup without registering a second job. max_instances
+        # and coalesce keep a slow run from overlapping with the next one.
         self.scheduler.add_job(
             self.cleanup_expired_files,
             'cron',
             hour=2,
             minute=0,
             id='file_cleanup',
-            replace_existing=True
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+            misfire_grace_time=3600,
+            next_run_time=datetime.now()
         )
-        
-        # Also run cleanup on startup
-        self.scheduler.add_job(
-            self.cleanup_expired_files,
-            'date',
-            run_date=datetime.now(),
-            id='file_cleanup_startup'
-        )
-        
+
         self.scheduler.start()
         logger.info("File cleanup scheduler started")
     
@@ -2,22 +2,41 @@
 import re
 import secrets
 import string
+from functools import lru_cache
 from pathlib import Path
-import bleach
 
+# Precompiled patterns for sanitize_filename - hoisted out of the
+# per-upload path
+_HTML_TAG_RE = re.compile(r'<[^>]*>')
+_MULTISPACE_RE = re.compile(r'\s+')
 
+# Deletion table for str.translate: one C-level pass drops the dangerous
+# characters (<, >, :, ", /, \, |, ?, * and controls) without the regex
+# engine
+_DANGEROUS_CHARS_TABLE = str.maketrans(
+    '', '', '<>:"/\\|?*' + ''.join(map(chr, range(0x20)))
+)
+
+
+@lru_cache(maxsize=4096)
 def sanitize_filename(filename: str) -> str:
     """
     Sanitize filename to prevent XSS and path traversal attacks.
-    
+
+    Pure string-to-string, so results are memoized - common names like
+    image.png recur constantly and become a dict hit.
+
     Args:
         filename: Original filename from user
         
     Returns:
         Sanitized filename safe for storage and display
     """
-    # Remove any HTML tags using bleach
-    filename = bleach.clean(filename, tags=[], strip=True)
+    # Remove any HTML tag constructs; leftover bare angle brackets are
+    # caught by the dangerous-character pass below. A regex strip is
+    # orders of magnitude cheaper than running bleach's full html5lib
+    # parse over what must not contain HTML anyway.
+    filename = _HTML_TAG_RE.sub('', filename)
     
     # Remove path components
     filename = Path(filename).name
@@ -25,10 +44,10 @@ def sanitize_filename(filename: str) -> str:
     # Remove dangerous characters but keep safe ones
     # Remove: <, >, :, ", /, \, |, ?, *, and other control characters
     # Keep: letters, numbers, spaces, dots, hyphens, underscores, parentheses
-    filename = re.sub(r'[<>:"/\\|?*\x00-\x1f]', '', filename)
-    
+    filename = filename.translate(_DANGEROUS_CHARS_TABLE)
+
     # Replace multiple spaces with single space
-    filename = re.sub(r'\s+', ' ', filename)
+    filename = _MULTISPACE_RE.sub(' ', filename)
     
     # Remove leading/trailing dots, spaces, and hyphens
     filename = filename.strip('. -')
@@ -50,18 +69,33 @@ def sanitize_filename(filename: str) -> str:
     return filename
 
 
+# Share-code alphabet (62 chars); 248 is the largest multiple of 62
+# that fits in a byte, used for rejection sampling below
+_SHARE_CODE_ALPHABET = string.ascii_letters + string.digits
+_REJECTION_BOUND = 248
+
+
 def generate_share_code(length: int = 6) -> str:
     """
     Generate a random share code for file access.
-    
+
     Args:
-        length: Length of the share code (default: 8)
-        
+        length: Length of the share code (default: 6)
+
     Returns:
         Random alphanumeric share code
     """
-    alphabet = string.ascii_letters + string.digits
-    return ''.join(secrets.choice(alphabet) for _ in range(length))
+    # One OS RNG read covers the whole code instead of one secrets.choice
+    # call per character; bytes beyond the rejection bound are dropped so
+    # the modulo stays uniform over the alphabet
+    chars = []
+    while len(chars) < length:
+        for byte in secrets.token_bytes(length - len(chars) + 4):
+            if byte < _REJECTION_BOUND:
+                chars.append(_SHARE_CODE_ALPHABET[byte % 62])
+                if len(chars) == length:
+                    break
+    return ''.join(chars)
 
 
 def get_client_ip(request) -> str:
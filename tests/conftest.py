@@ -1,9 +1,7 @@
 """Pytest configuration and shared fixtures."""
-import os
-import asyncio
-from pathlib import Path
 import pytest
 import pytest_asyncio
+from sqlalchemy.pool import StaticPool
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from httpx import AsyncClient, ASGITransport
 
@@ -12,51 +10,62 @@ from app.database import Base, get_db
 from app.config import settings
 
 
-# Test database URL
-TEST_DATABASE_URL = "sqlite+aiosqlite:///./test_filepulse.db"
+# Test database URL - in-memory so tests never pay SQLite's per-commit
+# fsync or leave a file to clean up
+TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
 
-@pytest.fixture(scope="session")
-def event_loop():
-    """Create event loop for async tests."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+@pytest_asyncio.fixture(scope="session")
+async def test_db_engine():
+    """Create the test database engine once for the whole session.
 
+    Building the engine and running create_all per test dominated suite
+    runtime; tests isolate themselves via the savepoint pattern in
+    test_db instead. StaticPool pins a single connection so the
+    in-memory database survives across checkouts.
+    """
+    engine = create_async_engine(TEST_DATABASE_URL, echo=False, poolclass=StaticPool)
 
-@pytest_asyncio.fixture(scope="function")
-async def test_db_engine():
-    """Create test database engine."""
-    engine = create_async_engine(TEST_DATABASE_URL, echo=False)
-    
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
-    
+
     yield engine
-    
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-    
+
     await engine.dispose()
-    
-    # Clean up database file
-    db_file = Path("./test_filepulse.db")
-    if db_file.exists():
-        db_file.unlink()
 
 
 @pytest_asyncio.fixture(scope="function")
 async def test_db(test_db_engine):
-    """Create test database session."""
-    async_session = async_sessionmaker(
-        test_db_engine,
-        class_=AsyncSession,
-        expire_on_commit=False
-    )
-    
-    async with async_session() as session:
+    """Create a test database session wrapped in a rolled-back transaction.
+
+    The session joins an external connection-level transaction and turns
+    commits into savepoints, so each test sees its own writes but leaves
+    the shared database untouched.
+    """
+    async with test_db_engine.connect() as conn:
+        trans = await conn.begin()
+        session = AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint"
+        )
+
         yield session
 
+        await session.close()
+        await trans.rollback()
+
+
+async def bulk_create_records(session, records):
+    """Insert several records with one flush instead of add/commit per row.
+
+    Args:
+        session: Database session to insert through
+        records: Iterable of model instances
+    """
+    session.add_all(records)
+    await session.commit()
+
 
 @pytest_asyncio.fixture(scope="function")
 async def client(test_db):
@@ -73,26 +82,60 @@ async def client(test_db):
     app.dependency_overrides.clear()
 
 
-@pytest.fixture
-def test_upload_dir(tmp_path):
-    """Create temporary upload directory."""
-    upload_dir = tmp_path / "uploads"
-    upload_dir.mkdir()
-    
+@pytest.fixture(scope="session")
+def test_upload_dir(tmp_path_factory):
+    """Create a temporary upload directory shared by the whole session.
+
+    Tests write distinctly named files, so one directory is safe and the
+    mkdir/override/teardown churn happens once instead of per test.
+    """
+    upload_dir = tmp_path_factory.mktemp("uploads")
+
     # Override settings
     original_upload_dir = settings.upload_dir
     settings.upload_dir = str(upload_dir)
-    
+
     yield upload_dir
-    
+
     # Restore original settings
     settings.upload_dir = original_upload_dir
 
 
-@pytest.fixture
-def sample_file(tmp_path):
-    """Create a sample file for testing."""
-    file_path = tmp_path / "test_file.txt"
+@pytest.fixture(scope="session")
+def sample_file(tmp_path_factory):
+    """Create a sample file once for the session; tests only read it."""
+    file_path = tmp_path_factory.mktemp("samples") / "test_file.txt"
     file_content = b"This is a test file content for FilePulse testing."
     file_path.write_bytes(file_content)
     return file_path
+
+
+@pytest.fixture(scope="session")
+def sample_bytes(sample_file):
+    """Sample file content, read from disk once per session."""
+    return sample_file.read_bytes()
+
+
+@pytest.fixture(scope="session")
+def sample_multipart(sample_bytes):
+    """Pre-encoded multipart upload body for the sample file.
+
+    Encoding once per session skips httpx's per-request multipart
+    encoder for tests that don't care about the upload's filename.
+
+    Returns:
+        Tuple of (body bytes, headers dict with the boundary set)
+    """
+    boundary = "filepulse-test-boundary"
+    body = (
+        (
+            f"--{boundary}\r\n"
+            'Content-Disposition: form-data; name="file"; filename="test_file.txt"\r\n'
+            "Content-Type: text/plain\r\n"
+            "\r\n"
+        ).encode()
+        + sample_bytes
+        + f"\r\n--{boundary}--\r\n".encode()
+    )
+    headers = {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+    return body, headers
@@ -1,10 +1,33 @@
 """Tests for database module."""
 import pytest
-from sqlalchemy import select
-from app.database import get_db, init_db, Base, engine
+from sqlalchemy import event, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.database import get_db, init_db, Base, _set_sqlite_pragmas
 from app.models import FileRecord
 
 
+@pytest.mark.asyncio
+async def test_engine_connect_applies_pragmas(tmp_path):
+    """Test that the connect listener applies the SQLite pragmas.
+
+    Uses a throwaway file-backed engine with the same listener attached,
+    so the hook is exercised without touching the production database
+    file. File-backed because WAL does not apply to :memory: databases.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'pragmas.db'}")
+    event.listens_for(engine.sync_engine, "connect")(_set_sqlite_pragmas)
+
+    try:
+        async with engine.connect() as conn:
+            journal_mode = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+            busy_timeout = (await conn.execute(text("PRAGMA busy_timeout"))).scalar()
+    finally:
+        await engine.dispose()
+
+    assert journal_mode.lower() == "wal"
+    assert busy_timeout == 5000
+
+
 @pytest.mark.asyncio
 async def test_init_db_creates_tables(test_db_engine):
     """Test that init_db creates all necessary tables."""
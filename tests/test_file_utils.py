@@ -1,7 +1,12 @@
 """Tests for file utility functions."""
 import pytest
 from pathlib import Path
-from app.utils.file_utils import calculate_md5, calculate_md5_from_bytes
+from app.utils.file_utils import (
+    calculate_md5,
+    calculate_md5_from_bytes,
+    calculate_file_hash,
+    new_file_hasher,
+)
 
 
 def test_calculate_md5(tmp_path):
@@ -66,6 +71,29 @@ def test_calculate_md5_from_bytes_empty():
     assert md5_hash == "d41d8cd98f00b204e9800998ecf8427e"
 
 
+def test_new_file_hasher_incremental_matches_file_hash(tmp_path):
+    """Test that incremental hashing matches whole-file hashing."""
+    content = b"Content for dedup hashing" * 100
+    test_file = tmp_path / "hash_test.bin"
+    test_file.write_bytes(content)
+
+    hasher = new_file_hasher()
+    hasher.update(content[:100])
+    hasher.update(content[100:])
+
+    assert hasher.hexdigest() == calculate_file_hash(test_file)
+
+
+def test_calculate_file_hash_different_content(tmp_path):
+    """Test that different files produce different dedup hashes."""
+    file_a = tmp_path / "a.txt"
+    file_b = tmp_path / "b.txt"
+    file_a.write_bytes(b"Content A")
+    file_b.write_bytes(b"Content B")
+
+    assert calculate_file_hash(file_a) != calculate_file_hash(file_b)
+
+
 def test_calculate_md5_different_content():
     """Test that different content produces different hashes."""
     data1 = b"Content A"
@@ -0,0 +1,51 @@
+"""Tests for the SSE progress broker."""
+import json
+import pytest
+
+from app.utils.progress import ProgressBroker
+
+
+@pytest.mark.asyncio
+async def test_event_stream_yields_published_progress():
+    """Test that published updates arrive as SSE-formatted JSON."""
+    broker = ProgressBroker()
+    broker.publish("upload-1", {"progress": 50, "status": "uploading"})
+    broker.publish("upload-1", {"progress": 100, "completed": True})
+
+    events = []
+    async for event in broker.event_stream("upload-1"):
+        events.append(event)
+
+    assert len(events) == 2
+    assert events[0].startswith("data: ")
+    assert events[0].endswith("\n\n")
+
+    first = json.loads(events[0][len("data: "):])
+    assert first == {"progress": 50, "status": "uploading"}
+
+    last = json.loads(events[1][len("data: "):])
+    assert last["completed"] is True
+
+
+@pytest.mark.asyncio
+async def test_event_stream_cleans_up_on_completion():
+    """Test that tracking state is dropped once a transfer completes."""
+    broker = ProgressBroker()
+    broker.publish("upload-2", {"progress": 100, "completed": True})
+
+    async for _ in broker.event_stream("upload-2"):
+        pass
+
+    assert "upload-2" not in broker._queues
+
+
+def test_broker_evicts_oldest_entries():
+    """Test that the queue map stays bounded via LRU eviction."""
+    broker = ProgressBroker(max_tracked=3)
+
+    for i in range(5):
+        broker.queue_for(f"transfer-{i}")
+
+    assert len(broker._queues) == 3
+    assert "transfer-0" not in broker._queues
+    assert "transfer-4" in broker._queues
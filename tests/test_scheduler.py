@@ -7,6 +7,7 @@ from unittest.mock import patch, MagicMock
 from app.models import FileRecord
 from app.utils.scheduler import FileCleanupScheduler
 from sqlalchemy import select
+from tests.conftest import bulk_create_records
 
 
 @pytest.mark.asyncio
@@ -31,14 +32,11 @@ async def test_cleanup_expired_files(test_db, test_upload_dir):
         file_md5="dummy_md5_expired"
     )
     
-    test_db.add(expired_record)
-    await test_db.commit()
-    
     # Create valid file
     valid_code = generate_share_code()
     valid_path = test_upload_dir / "valid.txt"
     valid_path.write_text("valid content")
-    
+
     valid_record = FileRecord(
         filename="valid.txt",
         original_filename="valid.txt",
@@ -50,9 +48,8 @@ async def test_cleanup_expired_files(test_db, test_upload_dir):
         file_size=13,
         file_md5="dummy_md5_valid"
     )
-    
-    test_db.add(valid_record)
-    await test_db.commit()
+
+    await bulk_create_records(test_db, [expired_record, valid_record])
     
     # Run cleanup with test session
     scheduler = FileCleanupScheduler()
@@ -117,14 +114,15 @@ async def test_cleanup_preserves_non_expired(test_db, test_upload_dir):
     
     # Create multiple non-expired files
     codes = []
+    records = []
     for i in range(3):
         code = generate_share_code()
         codes.append(code)
-        
+
         file_path = test_upload_dir / f"file_{i}.txt"
         file_path.write_text(f"content {i}")
-        
-        record = FileRecord(
+
+        records.append(FileRecord(
             filename=f"file_{i}.txt",
             original_filename=f"file_{i}.txt",
             share_code=code,
@@ -134,11 +132,9 @@ async def test_cleanup_preserves_non_expired(test_db, test_upload_dir):
             file_path=str(file_path),
             file_size=len(f"content {i}"),
             file_md5=f"dummy_md5_{i}"
-        )
-        
-        test_db.add(record)
-    
-    await test_db.commit()
+        ))
+
+    await bulk_create_records(test_db, records)
     
     # Run cleanup
     scheduler = FileCleanupScheduler()
@@ -190,9 +186,7 @@ async def test_cleanup_md5_deduplication(test_db, test_upload_dir):
         file_md5=shared_md5
     )
     
-    test_db.add(expired_record)
-    test_db.add(valid_record)
-    await test_db.commit()
+    await bulk_create_records(test_db, [expired_record, valid_record])
     
     # Run cleanup
     scheduler = FileCleanupScheduler()
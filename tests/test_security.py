@@ -1,9 +1,20 @@
 """Tests for security utilities."""
+from types import SimpleNamespace
+
 import pytest
-from unittest.mock import MagicMock
 from app.utils.security import sanitize_filename, generate_share_code, get_client_ip
 
 
+def _req(headers=None, client_host=None, client=True):
+    """Build a minimal fake request - get_client_ip only touches
+    headers.get and client.host, so MagicMock machinery is overkill."""
+    headers = headers or {}
+    return SimpleNamespace(
+        headers=SimpleNamespace(get=headers.get),
+        client=SimpleNamespace(host=client_host) if client else None
+    )
+
+
 def test_sanitize_filename_removes_html():
     """Test that HTML tags are removed from filenames."""
     dangerous_name = "<script>alert('xss')</script>test.txt"
@@ -32,19 +43,17 @@ def test_sanitize_filename_preserves_safe_chars():
     assert result == "my_document-v2.1.pdf"
 
 
-def test_sanitize_filename_handles_special_chars():
+@pytest.mark.parametrize("input_name, expected", [
+    ("document (copy).pdf", "document (copy).pdf"),  # Parentheses kept
+    ("file   name.txt", "file name.txt"),  # Multiple spaces to single
+    ("test<file>.txt", "test.txt"),  # Angle brackets and content between removed
+])
+def test_sanitize_filename_handles_special_chars(input_name, expected):
     """Test special character handling."""
     # Only < > : " / \ | ? * and control chars are removed
     # @#$ and other chars are kept
-    inputs_and_expected = [
-        ("document (copy).pdf", "document (copy).pdf"),  # Parentheses kept
-        ("file   name.txt", "file name.txt"),  # Multiple spaces to single
-        ("test<file>.txt", "test.txt"),  # Angle brackets and content between removed
-    ]
-    
-    for input_name,expected in inputs_and_expected:
-        result = sanitize_filename(input_name)
-        assert result == expected, f"Expected {expected}, got {result}"
+    result = sanitize_filename(input_name)
+    assert result == expected, f"Expected {expected}, got {result}"
 
 
 def test_sanitize_filename_handles_empty():
@@ -82,83 +91,53 @@ def test_generate_share_code_alphanumeric():
 
 def test_generate_share_code_uniqueness():
     """Test that generated codes are unique."""
-    codes = set()
-    for _ in range(100):
-        code = generate_share_code()
-        codes.add(code)
-    
-    # Should have 100 unique codes
-    assert len(codes) == 100
-
-
-def test_sanitize_filename_xss_variants():
+    # 100 draws from a 62^6 space should never collide
+    assert len({generate_share_code() for _ in range(100)}) == 100
+
+
+@pytest.mark.parametrize("vector", [
+    "<img src=x onerror=alert('XSS')>",
+    "<svg/onload=alert('XSS')>",
+    "javascript:alert('XSS')",
+    "<iframe src='javascript:alert(\"XSS\")'></iframe>",
+    "&#60;script&#62;alert('XSS')&#60;/script&#62;",
+])
+def test_sanitize_filename_xss_variants(vector):
     """Test various XSS attack vectors."""
-    xss_vectors = [
-        "<img src=x onerror=alert('XSS')>",
-        "<svg/onload=alert('XSS')>",
-        "javascript:alert('XSS')",
-        "<iframe src='javascript:alert(\"XSS\")'></iframe>",
-        "&#60;script&#62;alert('XSS')&#60;/script&#62;",
-    ]
-    
-    for vector in xss_vectors:
-        safe_name = sanitize_filename(f"{vector}file.txt")
-        
-        # Should not contain dangerous patterns
-        assert "<" not in safe_name
-        assert ">" not in safe_name
-
+    safe_name = sanitize_filename(f"{vector}file.txt")
 
-def test_sanitize_filename_sql_injection():
-    """Test SQL injection patterns in filenames."""
-    sql_patterns = [
-        "'; DROP TABLE files; --",
-        "1' OR '1'='1",
-        "admin'--",
-    ]
-    
-    for pattern in sql_patterns:
-        safe_name = sanitize_filename(f"{pattern}.txt")
-        
-        # Dangerous chars may be removed, just ensure no crashes
-        # and result is safe
-        assert safe_name
-        assert len(safe_name) > 0
-
-
-def test_get_client_ip_with_x_forwarded_for():
-    """Test get_client_ip with X-Forwarded-For header."""
-    request = MagicMock()
-    request.headers.get = lambda key: "203.0.113.1, 198.51.100.1" if key == "X-Forwarded-For" else None
-    
-    ip = get_client_ip(request)
-    assert ip == "203.0.113.1"
-
-
-def test_get_client_ip_with_x_real_ip():
-    """Test get_client_ip with X-Real-IP header."""
-    request = MagicMock()
-    request.headers.get = lambda key: "203.0.113.5" if key == "X-Real-IP" else None
-    
-    ip = get_client_ip(request)
-    assert ip == "203.0.113.5"
-
-
-def test_get_client_ip_fallback_to_client():
-    """Test get_client_ip fallback to direct client."""
-    request = MagicMock()
-    request.headers.get = lambda key: None
-    request.client.host = "192.168.1.100"
-    
-    ip = get_client_ip(request)
-    assert ip == "192.168.1.100"
+    # Should not contain dangerous patterns
+    assert "<" not in safe_name
+    assert ">" not in safe_name
 
 
-def test_get_client_ip_no_client():
-    """Test get_client_ip when client is None."""
-    request = MagicMock()
-    request.headers.get = lambda key: None
-    request.client = None
-    
-    ip = get_client_ip(request)
-    assert ip == "unknown"
+@pytest.mark.parametrize("pattern", [
+    "'; DROP TABLE files; --",
+    "1' OR '1'='1",
+    "admin'--",
+])
+def test_sanitize_filename_sql_injection(pattern):
+    """Test SQL injection patterns in filenames."""
+    safe_name = sanitize_filename(f"{pattern}.txt")
+
+    # Dangerous chars may be removed, just ensure no crashes
+    # and result is safe
+    assert safe_name
+    assert len(safe_name) > 0
+
+
+@pytest.mark.parametrize("headers, client_host, client, expected", [
+    # X-Forwarded-For wins and takes the first hop
+    ({"X-Forwarded-For": "203.0.113.1, 198.51.100.1"}, None, True, "203.0.113.1"),
+    # X-Real-IP is the next fallback
+    ({"X-Real-IP": "203.0.113.5"}, None, True, "203.0.113.5"),
+    # Direct client host when no proxy headers
+    (None, "192.168.1.100", True, "192.168.1.100"),
+    # No client at all
+    (None, None, False, "unknown"),
+])
+def test_get_client_ip(headers, client_host, client, expected):
+    """Test client IP extraction across header/client combinations."""
+    request = _req(headers, client_host=client_host, client=client)
+
+    assert get_client_ip(request) == expected
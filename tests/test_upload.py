@@ -1,22 +1,42 @@
 """Tests for file upload functionality."""
+import hashlib
 import io
+import re
 import pytest
 from pathlib import Path
-from sqlalchemy import select
+from sqlalchemy import select, bindparam
 
 from app.models import FileRecord
 
+# Verification lookups built once at module import; every test binds a
+# share code into the same compiled statement instead of rebuilding the
+# select chain
+_COLS_BY_CODE = select(
+    FileRecord.original_filename,
+    FileRecord.filename,
+    FileRecord.file_size,
+    FileRecord.file_path,
+    FileRecord.uploader_ip
+).where(FileRecord.share_code == bindparam("sc"))
+
+_COLS_BY_CODES = select(
+    FileRecord.share_code,
+    FileRecord.file_md5,
+    FileRecord.file_path
+).where(FileRecord.share_code.in_(bindparam("codes", expanding=True)))
+
+# YYYY/MM/DD segment somewhere in the stored path
+_DATE_PATH_RE = re.compile(r"[/\\]\d{4}[/\\]\d{2}[/\\]\d{2}[/\\]")
+
 
 @pytest.mark.asyncio
-async def test_upload_file_success(client, test_db, test_upload_dir, sample_file):
+async def test_upload_file_success(client, test_db, test_upload_dir, sample_bytes, sample_multipart):
     """Test successful file upload."""
-    # Read sample file
-    with open(sample_file, "rb") as f:
-        file_content = f.read()
-    
-    # Upload file
-    files = {"file": ("test_file.txt", io.BytesIO(file_content), "text/plain")}
-    response = await client.post("/api/upload", files=files)
+    file_content = sample_bytes
+
+    # Upload file (body pre-encoded once per session)
+    body, headers = sample_multipart
+    response = await client.post("/api/upload", content=body, headers=headers)
     
     assert response.status_code == 200
     data = response.json()
@@ -29,40 +49,43 @@ async def test_upload_file_success(client, test_db, test_upload_dir, sample_file
     assert "upload_time" in data
     assert "expiry_time" in data
     
-    # Verify database record
-    stmt = select(FileRecord).where(FileRecord.share_code == data["share_code"])
-    result = await test_db.execute(stmt)
-    record = result.scalar_one_or_none()
-    
-    assert record is not None
-    assert record.original_filename == "test_file.txt"
-    assert record.file_size == len(file_content)
-    
-    # Verify file exists on disk
-    file_path = Path(record.file_path)
-    assert file_path.exists()
-    assert file_path.read_bytes() == file_content
+    # The response already carries filename and file_size (asserted
+    # above); the record fetch only needs file_path for the disk check
+    result = await test_db.execute(_COLS_BY_CODE, {"sc": data["share_code"]})
+    row = result.one_or_none()
+
+    assert row is not None
+
+    # Verify file contents on disk via streaming digest rather than
+    # materializing the whole file in Python
+    file_path = Path(row.file_path)
+    assert file_path.stat().st_size == len(file_content)
+    with open(file_path, "rb") as f:
+        disk_digest = hashlib.file_digest(f, "blake2b").digest()
+    assert disk_digest == hashlib.blake2b(file_content).digest()
 
 
 @pytest.mark.asyncio
 async def test_upload_file_too_large(client, test_upload_dir):
     """Test upload rejection for oversized files."""
-    # Create large file content (> 100MB)
-    # Force a small limit for this test to avoid memory issues and ensure failure
-    from app.config import settings
-    original_limit = settings.max_file_size
-    settings.max_file_size = 1024 * 1024  # 1MB
-    
+    # The 413 branch only compares streamed size against the limit, so a
+    # tiny limit with a 2x payload exercises it without megabyte buffers
+    from app.routers import upload as upload_module
+    original_limit = upload_module.MAX_FILE_SIZE
+    upload_module.MAX_FILE_SIZE = 1024  # 1KB
+    upload_module.MAX_FILE_SIZE_MB = 1024 / 1_048_576
+
     try:
-        large_content = b"x" * (2 * 1024 * 1024)  # 2MB
-        
+        large_content = b"x" * 2048  # 2KB
+
         files = {"file": ("large_file.bin", io.BytesIO(large_content), "application/octet-stream")}
         response = await client.post("/api/upload", files=files)
-        
+
         assert response.status_code == 413
         assert "exceeds maximum" in response.json()["detail"]
     finally:
-        settings.max_file_size = original_limit
+        upload_module.MAX_FILE_SIZE = original_limit
+        upload_module.MAX_FILE_SIZE_MB = original_limit / 1_048_576
 
 
 @pytest.mark.asyncio
@@ -83,27 +106,23 @@ async def test_upload_filename_sanitization(client, test_db, test_upload_dir):
     assert "alert" in data["filename"]
     assert "xss" in data["filename"]
     
-    # Verify in database
-    stmt = select(FileRecord).where(FileRecord.share_code == data["share_code"])
-    result = await test_db.execute(stmt)
-    record = result.scalar_one_or_none()
-    
-    assert "<script>" not in record.original_filename
-    assert "<script>" not in record.filename
+    # original_filename round-trips through the response (asserted
+    # above); only the stored on-disk filename needs a DB look
+    result = await test_db.execute(_COLS_BY_CODE, {"sc": data["share_code"]})
+
+    assert "<script>" not in result.one().filename
 
 
 @pytest.mark.asyncio
-async def test_upload_unique_share_codes(client, test_upload_dir, sample_file):
+async def test_upload_unique_share_codes(client, test_upload_dir, sample_multipart):
     """Test that each upload generates a unique share code."""
-    with open(sample_file, "rb") as f:
-        file_content = f.read()
-    
+    body, headers = sample_multipart
+
     share_codes = set()
-    
+
     # Upload same file multiple times
     for _ in range(5):
-        files = {"file": ("test.txt", io.BytesIO(file_content), "text/plain")}
-        response = await client.post("/api/upload", files=files)
+        response = await client.post("/api/upload", content=body, headers=headers)
         
         assert response.status_code == 200
         share_code = response.json()["share_code"]
@@ -114,57 +133,44 @@ async def test_upload_unique_share_codes(client, test_upload_dir, sample_file):
 
 
 @pytest.mark.asyncio
-async def test_upload_stores_client_ip(client, test_db, test_upload_dir, sample_file):
+async def test_upload_stores_client_ip(client, test_db, test_upload_dir, sample_multipart):
     """Test that uploader IP is stored correctly."""
-    with open(sample_file, "rb") as f:
-        file_content = f.read()
-    
-    files = {"file": ("test.txt", io.BytesIO(file_content), "text/plain")}
-    response = await client.post("/api/upload", files=files)
+    body, headers = sample_multipart
+    response = await client.post("/api/upload", content=body, headers=headers)
     
     assert response.status_code == 200
     share_code = response.json()["share_code"]
     
     # Check database record
-    stmt = select(FileRecord).where(FileRecord.share_code == share_code)
-    result = await test_db.execute(stmt)
-    record = result.scalar_one_or_none()
-    
-    assert record.uploader_ip is not None
-    assert len(record.uploader_ip) > 0
+    result = await test_db.execute(_COLS_BY_CODE, {"sc": share_code})
+    uploader_ip = result.one().uploader_ip
+
+    assert uploader_ip is not None
+    assert len(uploader_ip) > 0
 
 
 @pytest.mark.asyncio
-async def test_upload_date_based_storage(client, test_db, test_upload_dir, sample_file):
+async def test_upload_date_based_storage(client, test_db, test_upload_dir, sample_multipart):
     """Test that files are stored in date-based directory structure."""
-    with open(sample_file, "rb") as f:
-        file_content = f.read()
-    
-    files = {"file": ("test.txt", io.BytesIO(file_content), "text/plain")}
-    response = await client.post("/api/upload", files=files)
+    body, headers = sample_multipart
+    response = await client.post("/api/upload", content=body, headers=headers)
     
     assert response.status_code == 200
     share_code = response.json()["share_code"]
     
     # Check file path structure
-    stmt = select(FileRecord).where(FileRecord.share_code == share_code)
-    result = await test_db.execute(stmt)
-    record = result.scalar_one_or_none()
-    
-    file_path = Path(record.file_path)
+    result = await test_db.execute(_COLS_BY_CODE, {"sc": share_code})
+
     # Path should contain YYYY/MM/DD structure
-    assert len(file_path.parts) >= 3
-    assert file_path.parts[-4].isdigit()  # Year
-    assert file_path.parts[-3].isdigit()  # Month
-    assert file_path.parts[-2].isdigit()  # Day
+    assert _DATE_PATH_RE.search(result.one().file_path) is not None
 
 
 @pytest.mark.asyncio
-async def test_upload_md5_deduplication(client, test_db, test_upload_dir, sample_file):
+async def test_upload_md5_deduplication(client, test_db, test_upload_dir):
     """Test that duplicate files share the same physical file."""
-    with open(sample_file, "rb") as f:
-        file_content = f.read()
-    
+    # Must exceed DEDUP_MIN_BYTES for the dedup lookup to kick in
+    file_content = b"shared content for dedup testing " * 4096  # ~128KB
+
     # Upload file twice
     files1 = {"file": ("file1.txt", io.BytesIO(file_content), "text/plain")}
     response1 = await client.post("/api/upload", files=files1)
@@ -174,34 +180,33 @@ async def test_upload_md5_deduplication(client, test_db, test_upload_dir, sample
     response2 = await client.post("/api/upload", files=files2)
     share_code2 = response2.json()["share_code"]
     
-    # Get both records
-    stmt1 = select(FileRecord).where(FileRecord.share_code == share_code1)
-    result1 = await test_db.execute(stmt1)
-    record1 = result1.scalar_one_or_none()
-    
-    stmt2 = select(FileRecord).where(FileRecord.share_code == share_code2)
-    result2 = await test_db.execute(stmt2)
-    record2 = result2.scalar_one_or_none()
-    
+    # Get both records in one round trip
+    result = await test_db.execute(
+        _COLS_BY_CODES, {"codes": [share_code1, share_code2]}
+    )
+    rows = {row.share_code: row for row in result}
+
+    record1 = rows[share_code1]
+    record2 = rows[share_code2]
+
     # Should have same MD5 and file_path (deduplication)
     assert record1.file_md5 == record2.file_md5
     assert record1.file_path == record2.file_path
-    
+
     # But different share codes
     assert record1.share_code != record2.share_code
 
 
 @pytest.mark.asyncio
-async def test_upload_with_debug_logging(client, test_upload_dir, sample_file):
+async def test_upload_with_debug_logging(client, test_upload_dir, sample_bytes):
     """Test debug logging when debug mode is enabled."""
     from app.config import settings
     original_debug = settings.debug
     settings.debug = True
-    
+
     try:
-        with open(sample_file, "rb") as f:
-            file_content = f.read()
-        
+        file_content = sample_bytes
+
         files = {"file": ("debug_test.txt", io.BytesIO(file_content), "text/plain")}
         response = await client.post("/api/upload", files=files)
         